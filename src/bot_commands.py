@@ -4,36 +4,105 @@ Long-polls getUpdates to handle /stream, /stopstream, /status commands.
 Runs in a daemon thread alongside recording and uploading.
 """
 
+import hashlib
+import json
+import os
 import threading
-import time
 import traceback
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
 import requests
 
 from logger_setup import setup_logger
-from notifier import send_telegram, pin_message, unpin_message, get_api_base_url
+from notifier import (
+    send_telegram,
+    pin_message,
+    unpin_message,
+    get_api_base_url,
+    api_url,
+    CONNECT_TIMEOUT,
+    get_session,
+    parse_response_json,
+)
 from streamer import start_stream, stop_stream, is_streaming
 
 logger = setup_logger(__name__)
 
+# getUpdates filter: only plain messages carry bot commands
+ALLOWED_UPDATES = '["message"]'
+
 # Message ID of the pinned stream link (to unpin on stop)
 _pinned_message_id: int | None = None
 
+# Last acknowledged getUpdates offset, persisted so a restart does not replay
+# updates Telegram still has buffered (up to 24h)
+_STATE_PATH = Path("./state/telegram_offset.json")
+
+# Recently processed update_ids — guards against Telegram redelivering an update
+# (e.g. a /stream starting VLC twice). Bounded LRU, oldest evicted first.
+_DEDUP_MAX = 1000
+_seen_updates: OrderedDict[int, None] = OrderedDict()
+
+# Single worker runs command handlers off the polling thread, so a slow handler
+# (VLC start, Telegram calls) never delays the next getUpdates acknowledgement.
+# One worker keeps commands strictly ordered.
+_handler_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bot-cmd")
+
+
+def _token_hash(bot_token: str) -> str:
+    """Short, non-reversible fingerprint of the bot token."""
+    return hashlib.sha256(bot_token.encode("utf-8")).hexdigest()[:16]
+
+
+def _load_offset(bot_token: str) -> int:
+    """Load the persisted getUpdates offset for this bot token.
+
+    Returns 0 if the state file is missing, unreadable, or belongs to another token.
+    """
+    try:
+        with open(_STATE_PATH, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return 0
+    except (OSError, ValueError) as exc:
+        logger.warning("Failed to read offset state %s: %s", _STATE_PATH, exc)
+        return 0
+
+    if state.get("bot_token_hash") != _token_hash(bot_token):
+        logger.info("Offset state belongs to another bot token, starting from 0")
+        return 0
+
+    offset = int(state.get("offset", 0))
+    logger.info("Loaded getUpdates offset: %d", offset)
+    return offset
+
+
+def _save_offset(bot_token: str, offset: int) -> None:
+    """Atomically persist the getUpdates offset (write temp file + os.replace)."""
+    state = {"bot_token_hash": _token_hash(bot_token), "offset": offset}
+    tmp_path = _STATE_PATH.with_suffix(".tmp")
+    try:
+        _STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, _STATE_PATH)
+    except OSError as exc:
+        logger.error("Failed to save offset state %s: %s", _STATE_PATH, exc)
 
-def _get_updates(config: dict, offset: int, timeout: int = 30) -> list:
-    """Call Telegram getUpdates with long polling."""
-    bot_token = config["telegram"]["bot_token"]
-    base = get_api_base_url(config)
-    url = f"{base}/bot{bot_token}/getUpdates"
 
+def _get_updates(updates_url: str, offset: int, timeout: int = 30) -> list:
+    """Call Telegram getUpdates with long polling."""
     try:
-        response = requests.get(
-            url,
-            params={"offset": offset, "timeout": timeout, "allowed_updates": '["message"]'},
-            timeout=timeout + 10,
+        response = get_session().get(
+            updates_url,
+            params={"offset": offset, "timeout": timeout, "allowed_updates": ALLOWED_UPDATES},
+            timeout=(CONNECT_TIMEOUT, timeout + 10),
         )
         if response.ok:
-            return response.json().get("result", [])
+            return parse_response_json(response).get("result", [])
         logger.error("getUpdates failed (status %s): %s", response.status_code, response.text[:200])
         return []
     except requests.RequestException as exc:
@@ -92,51 +161,83 @@ def _handle_status(config: dict, upload_queue_size: int = 0) -> None:
     send_telegram("\n".join(lines), config)
 
 
-def start_command_listener(config: dict, stop_event: threading.Event, upload_queue=None) -> None:
+# Command -> handler(config, queue_depth)
+_HANDLERS = {
+    "/stream": lambda config, queue_depth: _handle_stream(config),
+    "/stopstream": lambda config, queue_depth: _handle_stopstream(config),
+    "/status": lambda config, queue_depth: _handle_status(
+        config, queue_depth() if queue_depth else 0
+    ),
+}
+
+
+def _dispatch(update: dict, config: dict, queue_depth: Callable[[], int] | None = None) -> None:
+    """Route a single Telegram update to its command handler (runs on _handler_executor)."""
+    try:
+        chat_id = str(config["telegram"]["chat_id"])
+        message = update.get("message", {})
+        text = message.get("text", "")
+        msg_chat_id = str(message.get("chat", {}).get("id", ""))
+
+        # Only process commands from the configured chat
+        if msg_chat_id != chat_id:
+            return
+
+        # "/stream@BotName args" -> "/stream" (group chats append the bot name)
+        command = text.split(None, 1)[0].split("@", 1)[0] if text else ""
+        handler = _HANDLERS.get(command)
+        if handler:
+            logger.info("Command received: %s", command)
+            handler(config, queue_depth)
+    except Exception:
+        logger.error("Command handler error:\n%s", traceback.format_exc())
+
+
+def start_command_listener(
+    config: dict, stop_event: threading.Event, queue_depth: Callable[[], int] | None = None
+) -> None:
     """Long-poll Telegram getUpdates and handle bot commands.
 
     Args:
         config: Application config dict.
         stop_event: Event to signal shutdown.
-        upload_queue: Optional queue.Queue to report queue size in /status.
+        queue_depth: Optional callable returning the upload queue size for /status.
     """
-    chat_id = str(config["telegram"]["chat_id"])
-    offset = 0
+    bot_token = config["telegram"]["bot_token"]
+    updates_url = api_url(get_api_base_url(config), bot_token, "getUpdates")
+    offset = _load_offset(bot_token)
 
     logger.info("Command listener started")
 
     while not stop_event.is_set():
         try:
-            updates = _get_updates(config, offset, timeout=30)
+            updates = _get_updates(updates_url, offset, timeout=30)
 
+            fresh = []
             for update in updates:
-                offset = update["update_id"] + 1
+                update_id = update["update_id"]
+                # Never move backwards: a redelivered older update must not lower the saved offset
+                offset = max(offset, update_id + 1)
 
-                message = update.get("message", {})
-                text = message.get("text", "")
-                msg_chat_id = str(message.get("chat", {}).get("id", ""))
-
-                # Only process commands from the configured chat
-                if msg_chat_id != chat_id:
+                if update_id in _seen_updates:
+                    logger.info("Skipping duplicate update: %d", update_id)
                     continue
+                _seen_updates[update_id] = None
+                if len(_seen_updates) > _DEDUP_MAX:
+                    _seen_updates.popitem(last=False)
+                fresh.append(update)
+
+            # Acknowledge before handling: the next poll must not depend on handler latency
+            if updates:
+                _save_offset(bot_token, offset)
 
-                if text.startswith("/stream") and not text.startswith("/stopstream"):
-                    logger.info("Command received: /stream")
-                    _handle_stream(config)
-                elif text.startswith("/stopstream"):
-                    logger.info("Command received: /stopstream")
-                    _handle_stopstream(config)
-                elif text.startswith("/status"):
-                    logger.info("Command received: /status")
-                    queue_size = upload_queue.qsize() if upload_queue else 0
-                    _handle_status(config, queue_size)
+            for update in fresh:
+                _handler_executor.submit(_dispatch, update, config, queue_depth)
 
         except Exception:
             logger.error("Command listener error:\n%s", traceback.format_exc())
             # Wait before retrying to avoid tight loop on persistent errors
-            for _ in range(6):
-                if stop_event.is_set():
-                    return
-                time.sleep(5)
+            if stop_event.wait(30):
+                return
 
     logger.info("Command listener stopped")
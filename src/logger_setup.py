@@ -1,12 +1,21 @@
 """Structured logging setup for the CamKinescope project.
 
 Provides a single setup function that configures console and rotating file
-handlers with a unified format.
+handlers with a unified format. Handlers are installed once on the shared
+"camkinescope" parent logger; per-module loggers are its children and
+propagate to it, so every module writes through the same file handle.
+
+Logging calls only enqueue the record (QueueHandler); a single QueueListener
+thread does the console/file I/O, so worker threads never block on disk writes
+or log rotation.
 """
 
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 LOG_FORMAT = "[%(asctime)s] %(levelname)s %(name)s: %(message)s"
 DATE_FORMAT = "%d.%m.%Y %H:%M:%S"
@@ -14,26 +23,22 @@ DATE_FORMAT = "%d.%m.%Y %H:%M:%S"
 MAX_LOG_BYTES = 10 * 1024 * 1024  # 10 MB
 BACKUP_COUNT = 5
 
+ROOT_LOGGER_NAME = "camkinescope"
 
-def setup_logger(name: str, log_dir: str = "./logs") -> logging.Logger:
-    """Create and return a logger with console and rotating-file handlers.
+_root_configured = False
+_lock = threading.Lock()
+_listener: QueueListener | None = None
 
-    Args:
-        name: Logger name, typically ``__name__`` of the calling module.
-        log_dir: Directory where log files are stored. Created if missing.
 
-    Returns:
-        Configured :class:`logging.Logger` instance.
-    """
-    os.makedirs(log_dir, exist_ok=True)
+def _install_handlers(root: logging.Logger, log_dir: str) -> None:
+    """Route the shared parent logger through a queue to console + rotating-file handlers."""
+    global _listener
 
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
+    os.makedirs(log_dir, exist_ok=True)
 
-    # Avoid adding duplicate handlers when called more than once for the
-    # same logger name (e.g. during tests or module reloads).
-    if logger.handlers:
-        return logger
+    root.setLevel(logging.INFO)
+    # Keep records out of the Python root logger (avoids duplicate output)
+    root.propagate = False
 
     formatter = logging.Formatter(fmt=LOG_FORMAT, datefmt=DATE_FORMAT)
 
@@ -53,7 +58,33 @@ def setup_logger(name: str, log_dir: str = "./logs") -> logging.Logger:
     file_handler.setLevel(logging.INFO)
     file_handler.setFormatter(formatter)
 
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    log_queue = queue.Queue(-1)
+    _listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    _listener.start()
+    # Flush buffered records on interpreter shutdown
+    atexit.register(_listener.stop)
+
+    root.addHandler(QueueHandler(log_queue))
+
+
+def setup_logger(name: str, log_dir: str = "./logs") -> logging.Logger:
+    """Return a module logger that writes through the shared handlers.
+
+    The first call installs the handlers (``log_dir`` of that call wins);
+    later calls only look up the child logger.
+
+    Args:
+        name: Logger name, typically ``__name__`` of the calling module.
+        log_dir: Directory where log files are stored. Created if missing.
+
+    Returns:
+        Configured :class:`logging.Logger` instance.
+    """
+    global _root_configured
+
+    with _lock:
+        if not _root_configured:
+            _install_handlers(logging.getLogger(ROOT_LOGGER_NAME), log_dir)
+            _root_configured = True
 
-    return logger
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
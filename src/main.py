@@ -1,7 +1,8 @@
 """Main orchestrator for CamKinescope.
 
 Runs an infinite loop: record RTSP segment -> queue for upload -> repeat.
-A single upload worker thread processes files one at a time (sequential).
+Upload worker threads (kinescope.upload_workers, default 1 = sequential)
+take files from one shared queue, one file per worker at a time.
 On startup, queues any leftover .mp4 files from previous sessions.
 Before each upload, checks internet connectivity and network for extra devices.
 
@@ -10,26 +11,36 @@ Uploads start automatically when internet becomes available.
 If Kinescope upload fails after max retries, falls back to Telegram upload.
 """
 
+import os
 import sys
 import time
 import queue
 import shutil
+import socket
 import threading
 import traceback
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 
-import requests
-
-from recorder import load_config, record_segment, get_kinescope_title, cleanup_old_recordings, remux_ts_to_mp4
+from recorder import (
+    FILENAME_FORMAT,
+    load_config,
+    record_segment,
+    get_kinescope_title,
+    cleanup_old_recordings,
+    remux_ts_to_mp4,
+)
 from uploader import upload_to_kinescope
 from network_monitor import check_extra_devices
 from notifier import (
     notify_recording_started,
     notify_upload_complete,
     notify_error,
+    notify_error_async,
     notify_disk_space,
-    send_telegram,
+    send_telegram_async,
+    flush_notifications,
     send_video_to_telegram,
     delete_telegram_message,
 )
@@ -38,23 +49,84 @@ from logger_setup import setup_logger
 
 logger = setup_logger("main")
 
-# Upload queue: files processed one at a time by upload_worker
-_upload_queue = queue.Queue()
+# Fixed Telegram status messages
+MSG_STARTED = "🚀 CamKinescope запущен"
+MSG_STOPPED = "⏹ CamKinescope остановлен"
+MSG_PAUSED = "⏸ Пауза"
+MSG_RESUMED = "▶️ Возобновлено, проверяю очереди..."
+MSG_NETWORK_FREE = "▶️ Сеть свободна, загрузка возобновлена"
+
+# Connectivity probe target and backoff bounds (seconds) for wait_for_internet
+INTERNET_CHECK_HOST = "uploader.kinescope.io"
+INTERNET_BACKOFF_MIN = 5
+INTERNET_BACKOFF_MAX = 60
+
+# Upload pause due to extra devices on the network, shared by all upload workers
+# so the "paused"/"resumed" messages are sent once per episode, not per worker.
+_net_state = {"paused": False}
+_net_lock = threading.Lock()
+
+# User pause from the tray, shared by the main loop and all upload workers so
+# MSG_PAUSED/MSG_RESUMED are sent once per pause, not once per thread.
+_pause_state = {"paused": False}
+_pause_lock = threading.Lock()
+
+# Cached free space for check_disk_space (statvfs can block on slow/network disks).
+# Invalidated whenever this process deletes recordings.
+DISK_CACHE_TTL_SECONDS = 300
+_disk_cache = {"free_gb": None, "ts": 0.0}
+
+# Directories already created by this process (see _ensure_dir)
+_ensured_dirs: set[str] = set()
+
+# Upload queue shared by all upload_worker threads; each worker holds one file at a time
+_upload_queue = queue.SimpleQueue()
+
+# Files cleanup must skip: filepath -> "queued" (waiting in _upload_queue) or
+# "uploading" (held by an upload_worker). A file leaves this dict only when done.
+_file_state: dict[str, str] = {}
+_file_state_lock = threading.Lock()
+
+# Per-file retry counter: filepath -> RetryState. Shared by all upload workers;
+# an entry is only touched by the worker currently holding that file.
+_retry_state: dict[str, "RetryState"] = {}
+
+# Number of files waiting in _upload_queue. Updated under _file_state_lock
+# alongside every put/get; read lock-free by /status and the pause message.
+_queue_depth = 0
 
-# Track file currently being uploaded — used by cleanup to skip it
-_uploading_files = set()
-_uploading_lock = threading.Lock()
 
-# Track all files sitting in the upload queue — cleanup must skip these too
-_queued_files = set()
-_queued_lock = threading.Lock()
+@dataclass(slots=True)
+class RetryState:
+    """Kinescope upload attempts for one file and the Telegram error messages they produced."""
+    count: int = 0
+    error_msg_ids: list[int] = field(default_factory=list)
+
+
+def _invalidate_disk_cache() -> None:
+    """Force the next check_disk_space() to re-read disk usage (call after deleting files)."""
+    _disk_cache["ts"] = 0.0
+
+
+def _ensure_dir(path: str) -> None:
+    """Create `path` once per process; later calls skip the mkdir syscall."""
+    if path in _ensured_dirs:
+        return
+    Path(path).mkdir(parents=True, exist_ok=True)
+    _ensured_dirs.add(path)
 
 
 def check_disk_space(config: dict, min_free_gb: float = 2.0) -> bool:
     output_dir = Path(config["recording"]["output_dir"])
-    output_dir.mkdir(parents=True, exist_ok=True)
-    usage = shutil.disk_usage(str(output_dir))
-    free_gb = usage.free / (1024 ** 3)
+    _ensure_dir(str(output_dir))
+
+    now = time.monotonic()
+    if _disk_cache["free_gb"] is not None and now - _disk_cache["ts"] < DISK_CACHE_TTL_SECONDS:
+        free_gb = _disk_cache["free_gb"]
+    else:
+        usage = shutil.disk_usage(str(output_dir))
+        free_gb = usage.free / (1024 ** 3)
+        _disk_cache.update(free_gb=free_gb, ts=now)
 
     if free_gb < min_free_gb:
         logger.warning("Low disk space: %.2f GB free (min %.2f GB)", free_gb, min_free_gb)
@@ -63,23 +135,50 @@ def check_disk_space(config: dict, min_free_gb: float = 2.0) -> bool:
     return True
 
 
+def _error_summary(exc: BaseException) -> str:
+    """Short exception text for Telegram: type/message plus the innermost frame.
+
+    The full traceback is logged separately; notify_error truncates to 500 chars anyway.
+    """
+    summary = "".join(traceback.format_exception_only(type(exc), exc)).strip()
+    last = None
+    for last in traceback.walk_tb(exc.__traceback__):
+        pass
+    if last:
+        frame, lineno = last
+        summary += f"\n  at {Path(frame.f_code.co_filename).name}:{lineno} in {frame.f_code.co_name}"
+    return summary
+
+
+def sleep_or_stop(seconds: float, stop_event: threading.Event = None) -> bool:
+    """Sleep for `seconds`, waking immediately if stop_event is set.
+
+    Returns True if stop_event fired (caller should exit), False on timeout.
+    """
+    if stop_event is None:
+        time.sleep(seconds)
+        return False
+    return stop_event.wait(seconds)
+
+
 def wait_for_internet(stop_event: threading.Event = None) -> bool:
-    """Block until internet is reachable (Kinescope endpoint responds).
+    """Block until internet is reachable (TCP connect to the Kinescope uploader).
 
+    Uses a plain TCP probe (no TLS/HTTP) with exponential backoff 5s -> 60s.
     Returns True when connected, False if stop_event is set.
     """
+    backoff = INTERNET_BACKOFF_MIN
     while True:
         if stop_event and stop_event.is_set():
             return False
         try:
-            requests.head("https://uploader.kinescope.io", timeout=10)
-            return True
-        except (requests.ConnectionError, requests.Timeout, requests.RequestException):
-            logger.info("No internet connection, retrying in 60s")
-            for _ in range(12):  # 60s in 5s increments to respond to stop_event
-                if stop_event and stop_event.is_set():
-                    return False
-                time.sleep(5)
+            with socket.create_connection((INTERNET_CHECK_HOST, 443), timeout=5):
+                return True
+        except OSError:
+            logger.info("No internet connection, retrying in %ds", backoff)
+            if sleep_or_stop(backoff, stop_event):
+                return False
+            backoff = min(backoff * 2, INTERNET_BACKOFF_MAX)
 
 
 def wait_for_free_network(config: dict, stop_event: threading.Event = None) -> bool:
@@ -91,7 +190,6 @@ def wait_for_free_network(config: dict, stop_event: threading.Event = None) -> b
         return True  # Network monitoring not configured
 
     check_interval = config.get("network", {}).get("check_interval_seconds", 300)
-    notified_paused = False
 
     while True:
         if stop_event and stop_event.is_set():
@@ -100,24 +198,28 @@ def wait_for_free_network(config: dict, stop_event: threading.Event = None) -> b
         extra = check_extra_devices(config)
 
         if not extra:
-            if notified_paused:
-                send_telegram("▶️ Сеть свободна, загрузка возобновлена", config)
+            # Only the worker that observes the paused -> free transition notifies
+            with _net_lock:
+                was_paused = _net_state["paused"]
+                _net_state["paused"] = False
+            if was_paused:
+                send_telegram_async(MSG_NETWORK_FREE, config)
                 logger.info("Network clear, resuming upload")
             return True
 
-        if not notified_paused:
+        with _net_lock:
+            should_notify = not _net_state["paused"]
+            _net_state["paused"] = True
+        if should_notify:
             devices_str = ", ".join(extra)
-            send_telegram(
+            send_telegram_async(
                 f"⏸ Загрузка на паузе: доп. устройства в сети ({len(extra)}): {devices_str}",
                 config,
             )
-            notified_paused = True
 
         logger.info("Extra devices on network (%d), waiting %ds: %s", len(extra), check_interval, extra)
-        for _ in range(check_interval // 5):
-            if stop_event and stop_event.is_set():
-                return False
-            time.sleep(5)
+        if sleep_or_stop(check_interval, stop_event):
+            return False
 
 
 def wait_while_paused(pause_event: threading.Event, stop_event: threading.Event, config: dict) -> bool:
@@ -125,20 +227,29 @@ def wait_while_paused(pause_event: threading.Event, stop_event: threading.Event,
     if not pause_event.is_set():
         return True
 
-    send_telegram("⏸ Пауза", config)
-    logger.info("Paused by user")
+    # Only the first thread to observe the pause notifies
+    with _pause_lock:
+        should_notify = not _pause_state["paused"]
+        _pause_state["paused"] = True
+    if should_notify:
+        send_telegram_async(MSG_PAUSED, config)
+        logger.info("Paused by user")
 
+    # Re-check pause_event every 5s; stop_event interrupts the wait immediately
     while pause_event.is_set():
-        if stop_event and stop_event.is_set():
+        if sleep_or_stop(5, stop_event):
             return False
-        time.sleep(5)
 
-    # Resumed
-    send_telegram("▶️ Возобновлено, проверяю очереди...", config)
-    logger.info("Resumed by user")
-    pending = _upload_queue.qsize()
-    if pending:
-        send_telegram(f"📤 В очереди на загрузку: {pending} файлов", config)
+    # Resumed — only the first thread to observe the resume notifies
+    with _pause_lock:
+        was_paused = _pause_state["paused"]
+        _pause_state["paused"] = False
+    if was_paused:
+        send_telegram_async(MSG_RESUMED, config)
+        logger.info("Resumed by user")
+        pending = get_upload_queue_depth()
+        if pending:
+            send_telegram_async(f"📤 В очереди на загрузку: {pending} файлов", config)
 
     return True
 
@@ -148,21 +259,33 @@ def _get_protected_files() -> set:
 
     Includes files currently being uploaded AND files waiting in the upload queue.
     """
-    with _uploading_lock:
-        uploading = set(_uploading_files)
-    with _queued_lock:
-        queued = set(_queued_files)
-    return uploading | queued
+    with _file_state_lock:
+        return {path for path, state in _file_state.items() if state in ("queued", "uploading")}
+
+
+def get_upload_queue_depth() -> int:
+    """Return the number of files waiting in the upload queue (O(1), no locking)."""
+    return _queue_depth
+
+
+def _requeue(filepath: str) -> None:
+    """Put a file (back) into the upload queue, keeping it protected from cleanup."""
+    global _queue_depth
+    with _file_state_lock:
+        _file_state[filepath] = "queued"
+        _queue_depth += 1
+    _upload_queue.put_nowait(filepath)
 
 
 def upload_worker(config: dict, stop_event: threading.Event = None, pause_event: threading.Event = None) -> None:
     """Worker thread: processes upload queue one file at a time.
 
     After max_upload_retries failed Kinescope uploads, falls back to Telegram upload.
+    Several workers may run concurrently; they share _retry_state.
     """
+    global _queue_depth
     max_retries = config.get("kinescope", {}).get("max_upload_retries", 3)
-    # Per-file retry counter: filepath -> {"count": int, "error_msg_ids": [int]}
-    retry_state = {}
+    retry_state = _retry_state
 
     while True:
         if stop_event and stop_event.is_set():
@@ -178,70 +301,65 @@ def upload_worker(config: dict, stop_event: threading.Event = None, pause_event:
         except queue.Empty:
             continue
 
-        # File is now dequeued — remove from queued set (it moves to uploading set next)
-        with _queued_lock:
-            _queued_files.discard(filepath)
+        with _file_state_lock:
+            _queue_depth -= 1
 
         # Verify file still exists
         if not Path(filepath).exists():
             logger.warning("File no longer exists, skipping: %s", filepath)
             retry_state.pop(filepath, None)
+            with _file_state_lock:
+                _file_state.pop(filepath, None)
             continue
 
-        with _uploading_lock:
-            _uploading_files.add(filepath)
+        with _file_state_lock:
+            _file_state[filepath] = "uploading"
 
         title = get_kinescope_title(filepath)
 
         # Initialize retry state for this file
         if filepath not in retry_state:
-            retry_state[filepath] = {"count": 0, "error_msg_ids": []}
+            retry_state[filepath] = RetryState()
 
         requeued = False
         try:
             # Check pause before upload
             if pause_event and not wait_while_paused(pause_event, stop_event, config):
-                with _queued_lock:
-                    _queued_files.add(filepath)
-                _upload_queue.put(filepath)
+                _requeue(filepath)
                 requeued = True
                 break
 
             # 1. Wait for internet connectivity
             if not wait_for_internet(stop_event):
-                with _queued_lock:
-                    _queued_files.add(filepath)
-                _upload_queue.put(filepath)
+                _requeue(filepath)
                 requeued = True
                 break
 
             # 2. Wait for free network (no extra devices on 4G)
             if not wait_for_free_network(config, stop_event):
-                with _queued_lock:
-                    _queued_files.add(filepath)
-                _upload_queue.put(filepath)
+                _requeue(filepath)
                 requeued = True
                 break
 
             # 3. Upload to Kinescope
             logger.info("Upload started: %s (attempt %d/%d)",
-                        filepath, retry_state[filepath]["count"] + 1, max_retries)
+                        filepath, retry_state[filepath].count + 1, max_retries)
             result = upload_to_kinescope(filepath, title, config)
             play_link = result.get("play_link") if result else None
             notify_upload_complete(title, config, play_link=play_link)
 
             # Success — delete error messages and cleanup
-            _delete_error_messages(retry_state[filepath]["error_msg_ids"], config)
+            _delete_error_messages(retry_state[filepath].error_msg_ids, config)
             retry_state.pop(filepath, None)
             Path(filepath).unlink()
+            _invalidate_disk_cache()
             logger.info("Upload complete, file deleted: %s", filepath)
 
-        except Exception:
-            error_details = traceback.format_exc()
-            logger.error("Upload failed: %s\n%s", filepath, error_details)
+        except Exception as exc:
+            logger.error("Upload failed: %s\n%s", filepath, traceback.format_exc())
 
-            retry_state[filepath]["count"] += 1
-            current_count = retry_state[filepath]["count"]
+            retry_state[filepath].count += 1
+            current_count = retry_state[filepath].count
 
             if current_count >= max_retries:
                 # Kinescope exhausted — try Telegram fallback
@@ -249,30 +367,26 @@ def upload_worker(config: dict, stop_event: threading.Event = None, pause_event:
                             max_retries, filepath)
                 _handle_telegram_fallback(filepath, title, retry_state, config)
             else:
-                # Notify error and re-queue — keep file protected from cleanup
-                error_msg_id = notify_error("загрузка", error_details, config)
+                # Notify error, wait 60s, then re-queue. The file stays "uploading"
+                # during the wait, so no other worker retries it early.
+                error_msg_id = notify_error("загрузка", _error_summary(exc), config)
                 if error_msg_id:
-                    retry_state[filepath]["error_msg_ids"].append(error_msg_id)
-                with _queued_lock:
-                    _queued_files.add(filepath)
-                _upload_queue.put(filepath)
+                    retry_state[filepath].error_msg_ids.append(error_msg_id)
+                sleep_or_stop(60, stop_event)
+                _requeue(filepath)
                 requeued = True
-                # Wait 60s before retry
-                for _ in range(12):
-                    if stop_event and stop_event.is_set():
-                        break
-                    time.sleep(5)
 
         finally:
-            # Only remove from uploading set if file was NOT re-queued for retry
+            # Only drop protection if file was NOT re-queued for retry
             if not requeued:
-                with _uploading_lock:
-                    _uploading_files.discard(filepath)
+                with _file_state_lock:
+                    _file_state.pop(filepath, None)
 
         # Cleanup old recordings, skip files being uploaded
         try:
             skip = _get_protected_files()
             cleanup_old_recordings(config, skip_files=skip)
+            _invalidate_disk_cache()
         except Exception:
             logger.error("Cleanup failed: %s", traceback.format_exc())
 
@@ -284,22 +398,23 @@ def _handle_telegram_fallback(filepath: str, title: str, retry_state: dict, conf
     if tg_result and tg_result.get("message_id"):
         # Telegram upload succeeded
         logger.info("Telegram fallback succeeded for %s", filepath)
-        send_telegram(f"📹 Загружено в Telegram (фоллбэк): {title}", config)
+        send_telegram_async(f"📹 Загружено в Telegram (фоллбэк): {title}", config)
 
         # Delete previous error messages
-        _delete_error_messages(retry_state[filepath]["error_msg_ids"], config)
+        _delete_error_messages(retry_state[filepath].error_msg_ids, config)
         retry_state.pop(filepath, None)
 
         # Delete local file
         try:
             Path(filepath).unlink()
+            _invalidate_disk_cache()
             logger.info("File deleted after Telegram upload: %s", filepath)
         except OSError as exc:
             logger.error("Failed to delete file after Telegram upload: %s", exc)
     else:
         # Both Kinescope and Telegram failed
         logger.error("Telegram fallback also failed for %s, keeping file locally", filepath)
-        send_telegram(
+        send_telegram_async(
             f"⚠️ Не удалось загрузить ни в Kinescope, ни в Telegram: {title}\n"
             f"Файл сохранён локально: {filepath}",
             config,
@@ -319,49 +434,77 @@ def _delete_error_messages(msg_ids: list, config: dict) -> None:
 def enqueue_pending_files(config: dict) -> None:
     """Find and queue any .mp4 and .ts files left from previous sessions.
 
-    .ts files are remuxed to .mp4 before queueing.
+    .ts files are remuxed to .mp4 before queueing (queued as-is with recording.skip_remux).
     """
+    global _queue_depth
     output_dir = Path(config["recording"]["output_dir"])
     if not output_dir.exists():
         return
 
-    mp4_files = list(output_dir.glob("*.mp4"))
-    ts_files = list(output_dir.glob("*.ts"))
+    # One directory pass; DirEntry.stat() reuses data from the directory listing
+    # where the OS provides it, so each .mp4 is stat'ed once. Paths are built as
+    # str(output_dir / name) to match record_segment() and cleanup's skip check.
+    upload_entries = []  # (mtime_ns, path)
+    ts_files = []
+    with os.scandir(output_dir) as it:
+        for entry in it:
+            if not entry.is_file():
+                continue
+            if entry.name.endswith(".mp4"):
+                upload_entries.append((entry.stat().st_mtime_ns, str(output_dir / entry.name)))
+            elif entry.name.endswith(".ts"):
+                ts_files.append(str(output_dir / entry.name))
 
-    if not mp4_files and not ts_files:
+    if not upload_entries and not ts_files:
         return
 
-    total_found = len(mp4_files) + len(ts_files)
-    logger.info("Found %d pending file(s): %d .mp4, %d .ts", total_found, len(mp4_files), len(ts_files))
+    total_found = len(upload_entries) + len(ts_files)
+    logger.info("Found %d pending file(s): %d .mp4, %d .ts", total_found, len(upload_entries), len(ts_files))
 
     # Remux .ts files to .mp4
+    skip_remux = config["recording"].get("skip_remux", False)
     for ts_file in ts_files:
+        if skip_remux:
+            upload_entries.append((os.stat(ts_file).st_mtime_ns, ts_file))
+            continue
         logger.info("Remuxing pending .ts file: %s", ts_file)
-        mp4_path = remux_ts_to_mp4(str(ts_file), config)
+        mp4_path = remux_ts_to_mp4(ts_file, config)
         if mp4_path:
-            mp4_files.append(Path(mp4_path))
+            upload_entries.append((os.stat(mp4_path).st_mtime_ns, mp4_path))
         else:
             logger.error("Failed to remux %s, skipping", ts_file)
 
     # Sort all .mp4 files by modification time and enqueue
-    pending = sorted(mp4_files, key=lambda p: p.stat().st_mtime)
-    if not pending:
+    upload_entries.sort()
+    if not upload_entries:
         return
 
-    send_telegram(f"\U0001f4e4 Найдено {total_found} незагруженных файлов, начинаю загрузку", config)
+    send_telegram_async(f"\U0001f4e4 Найдено {total_found} незагруженных файлов, начинаю загрузку", config)
 
-    for mp4_file in pending:
-        filepath = str(mp4_file)
-        with _queued_lock:
-            _queued_files.add(filepath)
-        _upload_queue.put(filepath)
+    # Mark all files protected under one lock acquisition, then push to the queue.
+    # dict.fromkeys drops duplicates (a remuxed .ts may share a name with an .mp4).
+    paths = []
+    with _file_state_lock:
+        for filepath in dict.fromkeys(path for _, path in upload_entries):
+            if filepath in _file_state:
+                continue
+            _file_state[filepath] = "queued"
+            paths.append(filepath)
+        _queue_depth += len(paths)
+    for filepath in paths:
+        _upload_queue.put_nowait(filepath)
 
 
 def enqueue_upload(filepath: str) -> None:
-    """Add a file to the upload queue."""
-    with _queued_lock:
-        _queued_files.add(filepath)
-    _upload_queue.put(filepath)
+    """Add a file to the upload queue (no-op if it is already queued or uploading)."""
+    global _queue_depth
+    with _file_state_lock:
+        if filepath in _file_state:
+            logger.info("File already queued or uploading, skipping: %s", filepath)
+            return
+        _file_state[filepath] = "queued"
+        _queue_depth += 1
+    _upload_queue.put_nowait(filepath)
     logger.info("File queued for upload: %s", filepath)
 
 
@@ -369,22 +512,26 @@ def main(stop_event: threading.Event = None, pause_event: threading.Event = None
     config_path = Path(__file__).parent.parent / "config.yaml"
     config = load_config(str(config_path))
 
-    send_telegram("🚀 CamKinescope запущен", config)
-    logger.info("CamKinescope started, entering main loop")
+    send_telegram_async(MSG_STARTED, config)
+    logger.info("CamKinescope started from %s, entering main loop", Path(__file__).resolve())
 
-    # Start single upload worker thread (sequential uploads)
-    worker = threading.Thread(
-        target=upload_worker,
-        args=(config, stop_event, pause_event),
-        daemon=True,
-    )
-    worker.start()
+    # Start upload worker threads (default 1 = sequential uploads, keeps 4G bandwidth free)
+    upload_workers = max(1, int(config.get("kinescope", {}).get("upload_workers", 1)))
+    for worker_index in range(upload_workers):
+        worker = threading.Thread(
+            target=upload_worker,
+            args=(config, stop_event, pause_event),
+            name=f"upload-worker-{worker_index + 1}",
+            daemon=True,
+        )
+        worker.start()
+    logger.info("Started %d upload worker(s)", upload_workers)
 
     # Start Telegram command listener (handles /stream, /stopstream, /status)
     if config.get("streaming"):
         cmd_listener = threading.Thread(
             target=start_command_listener,
-            args=(config, stop_event or threading.Event(), _upload_queue),
+            args=(config, stop_event or threading.Event(), get_upload_queue_depth),
             daemon=True,
         )
         cmd_listener.start()
@@ -404,22 +551,25 @@ def main(stop_event: threading.Event = None, pause_event: threading.Event = None
                 logger.info("Disk space low, running cleanup")
                 skip = _get_protected_files()
                 cleanup_old_recordings(config, skip_files=skip)
+                _invalidate_disk_cache()
                 if not check_disk_space(config):
                     logger.error("Disk space still insufficient, waiting 60s")
-                    time.sleep(60)
+                    sleep_or_stop(60, stop_event)
                     continue
 
-            # Notify recording start
-            filename = datetime.now().strftime("%d.%m.%Y %H_%M") + ".mp4"
+            # Notify recording start (same timestamp names the file)
+            started_at = datetime.now()
+            suffix = ".ts" if config["recording"].get("skip_remux", False) else ".mp4"
+            filename = started_at.strftime(FILENAME_FORMAT) + suffix
             notify_recording_started(filename, config)
 
             # Record segment (blocks for duration_seconds)
             # Recording works on local LAN — no internet required
-            filepath = record_segment(config)
+            filepath = record_segment(config, stop_event=stop_event, started_at=started_at)
 
             if filepath is None:
-                notify_error("запись", "VLC recording returned no file", config)
-                time.sleep(10)
+                notify_error_async("запись", "VLC recording returned no file", config)
+                sleep_or_stop(10, stop_event)
                 continue
 
             # Queue for upload — next recording starts immediately
@@ -428,18 +578,20 @@ def main(stop_event: threading.Event = None, pause_event: threading.Event = None
 
         except KeyboardInterrupt:
             logger.info("Stopped by user (KeyboardInterrupt)")
-            send_telegram("⏹ CamKinescope остановлен", config)
+            send_telegram_async(MSG_STOPPED, config)
             break
-        except Exception:
-            error_details = traceback.format_exc()
-            logger.error("Critical error in main loop:\n%s", error_details)
-            notify_error("критическая", error_details, config)
+        except Exception as exc:
+            logger.error("Critical error in main loop:\n%s", traceback.format_exc())
+            notify_error_async("критическая", _error_summary(exc), config)
             logger.info("Sleeping 60 seconds before retry")
-            time.sleep(60)
+            sleep_or_stop(60, stop_event)
 
     if stop_event and stop_event.is_set():
         logger.info("Stop event received, shutting down")
-        send_telegram("⏹ CamKinescope остановлен", config)
+        send_telegram_async(MSG_STOPPED, config)
+
+    # Deliver queued notifications (incl. the stop message) before the process exits
+    flush_notifications()
 
 
 if __name__ == "__main__":
@@ -7,13 +7,23 @@ to preserve 4G bandwidth for connected users.
 
 import subprocess
 import re
+from concurrent.futures import ThreadPoolExecutor
+
 from logger_setup import setup_logger
 
 logger = setup_logger(__name__)
 
+# Concurrent ping processes during the subnet sweep
+PING_WORKERS = 64
+
+# Don't open a console window per ping when running under pythonw (Windows only)
+_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
 # Regex to parse Windows `arp -a` output lines like:
 #   10.0.0.103            00-1a-2b-3c-4d-5e     dynamic
-ARP_LINE_RE = re.compile(r"(\d+\.\d+\.\d+\.\d+)\s+([\w-]+)\s+(\w+)")
+# Matches only dynamic entries and rejects x.x.x.255 broadcasts in the pattern itself.
+# Matched on raw bytes: the fields we need are ASCII, so stdout is never decoded.
+ARP_LINE_RE = re.compile(rb"(\d+\.\d+\.\d+\.(?!255\b)\d+)\s+[\w-]+\s+dynamic\b", re.IGNORECASE)
 
 
 def get_arp_devices() -> set:
@@ -25,37 +35,45 @@ def get_arp_devices() -> set:
     try:
         result = subprocess.run(
             ["arp", "-a"],
-            capture_output=True, text=True, timeout=10,
+            capture_output=True, timeout=10,
         )
-        ips = set()
-        for line in result.stdout.splitlines():
-            match = ARP_LINE_RE.search(line)
-            if match:
-                ip = match.group(1)
-                mac_type = match.group(3).lower()
-                # Skip broadcast/multicast addresses
-                if mac_type == "dynamic" and not ip.endswith(".255"):
-                    ips.add(ip)
-        return ips
+        return {
+            match.group(1).decode("ascii")
+            for line in result.stdout.splitlines()
+            if (match := ARP_LINE_RE.search(line))
+        }
     except Exception as exc:
         logger.warning("ARP scan failed: %s", exc)
         return set()
 
 
+def _ping_once(ip: str) -> None:
+    """Send a single ping (1 packet, 100ms timeout) to populate the ARP entry."""
+    subprocess.run(
+        ["ping", "-n", "1", "-w", "100", ip],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        timeout=5,
+        creationflags=_NO_WINDOW,
+    )
+
+
 def ping_subnet(subnet_prefix: str = "10.0.0", start: int = 1, end: int = 254) -> None:
     """Ping sweep to populate ARP table (Windows).
 
-    Runs quick pings with 1 packet, 100ms timeout.
+    Pings all hosts concurrently (PING_WORKERS at a time), so the sweep takes
+    roughly (end - start + 1) / PING_WORKERS * 100ms instead of a serial sweep.
     This ensures ARP table is fresh before checking.
     """
+    ips = [f"{subnet_prefix}.{i}" for i in range(start, end + 1)]
     try:
-        # Windows: ping with -n 1 -w 100 (1 packet, 100ms timeout)
-        # Run as batch to speed up
-        cmd = f'for /L %i in ({start},1,{end}) do @ping -n 1 -w 100 {subnet_prefix}.%i >nul 2>&1'
-        subprocess.run(
-            ["cmd", "/c", cmd],
-            capture_output=True, timeout=120,
-        )
+        with ThreadPoolExecutor(max_workers=PING_WORKERS) as executor:
+            for future in [executor.submit(_ping_once, ip) for ip in ips]:
+                # Individual ping failures are expected (no host) — ignore them
+                try:
+                    future.result()
+                except Exception:
+                    pass
     except Exception as exc:
         logger.warning("Ping sweep failed: %s", exc)
 
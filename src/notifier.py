@@ -4,20 +4,94 @@ Sends formatted messages to a configured Telegram chat via the Bot API.
 Supports Local Bot API Server for large file uploads (up to 2 GB).
 All notification functions are fire-and-forget: they catch network errors
 internally so a failed notification never crashes the main process.
+
+send_telegram_async(), notify_error_async() and the notify_* status helpers
+don't block the caller: messages go to a bounded queue drained by one
+background sender thread. Use the synchronous send_telegram()/notify_error()
+when the message_id is needed (pin/delete), and flush_notifications() before
+exiting.
 """
 
+import functools
+import queue
+import threading
 from pathlib import Path
 
 import requests
 import yaml
+from requests.adapters import HTTPAdapter
+from requests_toolbelt.multipart.encoder import MultipartEncoder
+from urllib3.util.retry import Retry
 
 from logger_setup import setup_logger
 
+# Optional faster JSON decoder; stdlib json (via response.json()) is used if absent
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = setup_logger(__name__)
 
+# (connect, read) timeouts: each connection attempt to a dead link gives up after
+# ~3s instead of the full read budget; with the single connect retry on _session a
+# synchronous send fails within ~6s (DNS lookup time is not covered by this bound).
+CONNECT_TIMEOUT = 3.05
+REQUEST_TIMEOUT = (CONNECT_TIMEOUT, 27)
+VIDEO_UPLOAD_TIMEOUT = (CONNECT_TIMEOUT, 600)  # 10 min read for large files
+
+# Transient network/gateway errors and flood-control 429s (with Retry-After) are
+# retried inside urllib3 with backoff, but only on the background sender's
+# session: nobody waits on it, so it can ride out ~1 min of flakiness.
+# read=0: a POST whose response was lost may already have been delivered, so
+# retrying it would duplicate the chat message. raise_on_status=False returns
+# the last 5xx response so callers log it as usual.
+_async_retry = Retry(
+    total=5,
+    read=0,
+    backoff_factor=2,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset(["HEAD", "GET", "POST"]),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+# Synchronous callers (pin/delete, error messages whose id is kept, getUpdates)
+# block on the request, so they get one quick retry and short backoff instead.
+_retry = Retry(
+    total=2,
+    connect=1,
+    read=0,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset(["HEAD", "GET", "POST"]),
+    respect_retry_after_header=False,
+    raise_on_status=False,
+)
+
+# Shared keep-alive session: one TLS connection per pool slot instead of a new
+# handshake per request. Several slots so the getUpdates long-poll never blocks sends.
+_session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=_retry)
+_session.mount("https://", _adapter)
+_session.mount("http://", _adapter)
+
+# Session used only by the background sender thread (see send_telegram_async)
+_async_session = requests.Session()
+_async_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=_async_retry)
+_async_session.mount("https://", _async_adapter)
+_async_session.mount("http://", _async_adapter)
+
+# File uploads stream a one-shot body that cannot be replayed, so only connect
+# errors (nothing sent yet) are retried.
+_upload_session = requests.Session()
+_upload_adapter = HTTPAdapter(max_retries=Retry(total=3, connect=3, read=0, status=0, other=0))
+_upload_session.mount("https://", _upload_adapter)
+_upload_session.mount("http://", _upload_adapter)
+
 
 # ---------------------------------------------------------------------------
-# API base URL helper
+# API base URL / session helpers
 # ---------------------------------------------------------------------------
 
 def get_api_base_url(config: dict) -> str:
@@ -25,34 +99,59 @@ def get_api_base_url(config: dict) -> str:
     return config["telegram"].get("api_base_url", "https://api.telegram.org")
 
 
+def get_session() -> requests.Session:
+    """Return the shared Telegram HTTP session (thread-safe for concurrent requests)."""
+    return _session
+
+
+@functools.lru_cache(maxsize=None)
+def api_url(base: str, bot_token: str, method: str) -> str:
+    """Return the Bot API URL for `method` (cached: config is fixed for the run)."""
+    return f"{base}/bot{bot_token}/{method}"
+
+
+def parse_response_json(response: requests.Response) -> dict:
+    """Decode a Telegram API JSON response body (orjson if installed, else stdlib).
+
+    Raises requests.JSONDecodeError either way, so callers' RequestException
+    handlers also cover a non-JSON body (e.g. a captive-portal HTML page).
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(response.content)
+        except orjson.JSONDecodeError as exc:
+            raise requests.JSONDecodeError(exc.msg, exc.doc, exc.pos) from exc
+    return response.json()
+
+
 # ---------------------------------------------------------------------------
 # Core send functions
 # ---------------------------------------------------------------------------
 
-def send_telegram(message: str, config: dict) -> int | None:
+def send_telegram(message: str, config: dict, session: requests.Session = None) -> int | None:
     """Send a message to Telegram using the Bot API.
 
     Args:
         message: Text to send (HTML parse mode is used).
         config:  Application config dict.
+        session: HTTP session to send with (default: the shared synchronous one).
 
     Returns:
         message_id (int) on success, None on failure.
     """
     bot_token = config["telegram"]["bot_token"]
     chat_id = config["telegram"]["chat_id"]
-    base = get_api_base_url(config)
-    url = f"{base}/bot{bot_token}/sendMessage"
+    url = api_url(get_api_base_url(config), bot_token, "sendMessage")
 
     try:
-        response = requests.post(
+        response = (session or _session).post(
             url,
             json={"chat_id": chat_id, "text": message, "parse_mode": "HTML"},
-            timeout=30,
+            timeout=REQUEST_TIMEOUT,
         )
         if response.ok:
             logger.info("Telegram notification sent successfully")
-            data = response.json()
+            data = parse_response_json(response)
             return data.get("result", {}).get("message_id")
         logger.error(
             "Telegram API returned status %s: %s",
@@ -65,7 +164,7 @@ def send_telegram(message: str, config: dict) -> int | None:
         return None
 
 
-def send_telegram_plain(message: str, config: dict) -> int | None:
+def send_telegram_plain(message: str, config: dict, session: requests.Session = None) -> int | None:
     """Send a plain-text message (no HTML parsing) to avoid issues with tracebacks.
 
     Returns:
@@ -73,18 +172,17 @@ def send_telegram_plain(message: str, config: dict) -> int | None:
     """
     bot_token = config["telegram"]["bot_token"]
     chat_id = config["telegram"]["chat_id"]
-    base = get_api_base_url(config)
-    url = f"{base}/bot{bot_token}/sendMessage"
+    url = api_url(get_api_base_url(config), bot_token, "sendMessage")
 
     try:
-        response = requests.post(
+        response = (session or _session).post(
             url,
             json={"chat_id": chat_id, "text": message},
-            timeout=30,
+            timeout=REQUEST_TIMEOUT,
         )
         if response.ok:
             logger.info("Telegram notification sent successfully")
-            data = response.json()
+            data = parse_response_json(response)
             return data.get("result", {}).get("message_id")
         logger.error(
             "Telegram API returned status %s: %s",
@@ -97,6 +195,55 @@ def send_telegram_plain(message: str, config: dict) -> int | None:
         return None
 
 
+# ---------------------------------------------------------------------------
+# Background sender (non-blocking notifications)
+# ---------------------------------------------------------------------------
+
+# Items: (func, args) to call, or a threading.Event to set (flush marker)
+_notify_queue: queue.Queue = queue.Queue(maxsize=256)
+
+
+def _notify_worker() -> None:
+    """Drain _notify_queue forever, sending one message at a time in order."""
+    while True:
+        item = _notify_queue.get()
+        if isinstance(item, threading.Event):
+            item.set()
+            continue
+        func, args = item
+        try:
+            func(*args)
+        except Exception as exc:
+            logger.error("Background Telegram send failed: %s", exc)
+
+
+threading.Thread(target=_notify_worker, name="telegram-sender", daemon=True).start()
+
+
+def send_telegram_async(message: str, config: dict) -> None:
+    """Queue a message for the background sender and return immediately.
+
+    Drops the message (with a warning) if the queue is full, e.g. after a long outage.
+    """
+    try:
+        _notify_queue.put_nowait((send_telegram, (message, config, _async_session)))
+    except queue.Full:
+        logger.warning("Telegram send queue full, dropping message: %s", message[:100])
+
+
+def flush_notifications(timeout: float = 10.0) -> bool:
+    """Wait until all messages queued so far have been sent (or timeout).
+
+    Returns True if the queue drained within timeout.
+    """
+    done = threading.Event()
+    try:
+        _notify_queue.put(done, timeout=timeout)
+    except queue.Full:
+        return False
+    return done.wait(timeout)
+
+
 # ---------------------------------------------------------------------------
 # Video upload to Telegram (fallback for Kinescope failures)
 # ---------------------------------------------------------------------------
@@ -114,23 +261,29 @@ def send_video_to_telegram(filepath: str, title: str, config: dict) -> dict | No
     """
     bot_token = config["telegram"]["bot_token"]
     chat_id = config["telegram"]["chat_id"]
-    base = get_api_base_url(config)
-    url = f"{base}/bot{bot_token}/sendVideo"
+    url = api_url(get_api_base_url(config), bot_token, "sendVideo")
 
     file_path = Path(filepath)
+    mime_type = "video/mp2t" if file_path.suffix.lower() == ".ts" else "video/mp4"
     file_size_mb = file_path.stat().st_size / (1024 * 1024)
     logger.info("Uploading video to Telegram: %s (%.1f MB)", file_path.name, file_size_mb)
 
     try:
         with open(filepath, "rb") as video_file:
-            response = requests.post(
+            # Streams the multipart body from disk instead of building it in memory
+            encoder = MultipartEncoder(fields={
+                "chat_id": str(chat_id),
+                "caption": title,
+                "video": (file_path.name, video_file, mime_type),
+            })
+            response = _upload_session.post(
                 url,
-                data={"chat_id": chat_id, "caption": title},
-                files={"video": (file_path.name, video_file, "video/mp4")},
-                timeout=600,  # 10 min for large files
+                data=encoder,
+                headers={"Content-Type": encoder.content_type},
+                timeout=VIDEO_UPLOAD_TIMEOUT,
             )
         if response.ok:
-            data = response.json()
+            data = parse_response_json(response)
             message_id = data.get("result", {}).get("message_id")
             logger.info("Video uploaded to Telegram: %s (message_id=%s)", file_path.name, message_id)
             return {"message_id": message_id}
@@ -161,14 +314,13 @@ def delete_telegram_message(message_id: int, config: dict) -> bool:
     """
     bot_token = config["telegram"]["bot_token"]
     chat_id = config["telegram"]["chat_id"]
-    base = get_api_base_url(config)
-    url = f"{base}/bot{bot_token}/deleteMessage"
+    url = api_url(get_api_base_url(config), bot_token, "deleteMessage")
 
     try:
-        response = requests.post(
+        response = _session.post(
             url,
             json={"chat_id": chat_id, "message_id": message_id},
-            timeout=30,
+            timeout=REQUEST_TIMEOUT,
         )
         if response.ok:
             logger.info("Telegram message deleted: %s", message_id)
@@ -200,14 +352,13 @@ def pin_message(message_id: int, config: dict) -> bool:
     """
     bot_token = config["telegram"]["bot_token"]
     chat_id = config["telegram"]["chat_id"]
-    base = get_api_base_url(config)
-    url = f"{base}/bot{bot_token}/pinChatMessage"
+    url = api_url(get_api_base_url(config), bot_token, "pinChatMessage")
 
     try:
-        response = requests.post(
+        response = _session.post(
             url,
             json={"chat_id": chat_id, "message_id": message_id, "disable_notification": True},
-            timeout=30,
+            timeout=REQUEST_TIMEOUT,
         )
         if response.ok:
             logger.info("Message pinned: %s", message_id)
@@ -235,14 +386,13 @@ def unpin_message(message_id: int, config: dict) -> bool:
     """
     bot_token = config["telegram"]["bot_token"]
     chat_id = config["telegram"]["chat_id"]
-    base = get_api_base_url(config)
-    url = f"{base}/bot{bot_token}/unpinChatMessage"
+    url = api_url(get_api_base_url(config), bot_token, "unpinChatMessage")
 
     try:
-        response = requests.post(
+        response = _session.post(
             url,
             json={"chat_id": chat_id, "message_id": message_id},
-            timeout=30,
+            timeout=REQUEST_TIMEOUT,
         )
         if response.ok:
             logger.info("Message unpinned: %s", message_id)
@@ -262,17 +412,25 @@ def unpin_message(message_id: int, config: dict) -> bool:
 # Convenience notification helpers
 # ---------------------------------------------------------------------------
 
-def notify_recording_started(filename: str, config: dict) -> int | None:
-    """Notify that a new recording has started."""
-    return send_telegram(f"\U0001f3a5 Запись начата: {filename}", config)
+def notify_recording_started(filename: str, config: dict) -> None:
+    """Notify that a new recording has started (non-blocking)."""
+    send_telegram_async(f"\U0001f3a5 Запись начата: {filename}", config)
 
 
-def notify_upload_complete(title: str, config: dict, play_link: str = None) -> int | None:
-    """Notify that a file has been uploaded to Kinescope, with play link if available."""
+def notify_upload_complete(title: str, config: dict, play_link: str = None) -> None:
+    """Notify that a file has been uploaded to Kinescope, with play link if available (non-blocking)."""
     msg = f"\u2705 Загружено в Kinescope: {title}"
     if play_link:
         msg += f"\n\U0001f517 {play_link}"
-    return send_telegram(msg, config)
+    send_telegram_async(msg, config)
+
+
+def _error_message(error_type: str, details: str) -> str:
+    """Format an error notification (plain text)."""
+    # Truncate long tracebacks to fit Telegram message limit
+    if len(details) > 500:
+        details = details[:500] + "..."
+    return f"\u274c Ошибка ({error_type}): {details}"
 
 
 def notify_error(error_type: str, details: str, config: dict) -> int | None:
@@ -281,16 +439,22 @@ def notify_error(error_type: str, details: str, config: dict) -> int | None:
     Returns:
         message_id (int) on success, None on failure.
     """
-    # Truncate long tracebacks to fit Telegram message limit
-    if len(details) > 500:
-        details = details[:500] + "..."
-    msg = f"\u274c Ошибка ({error_type}): {details}"
-    return send_telegram_plain(msg, config)
+    return send_telegram_plain(_error_message(error_type, details), config)
+
+
+def notify_error_async(error_type: str, details: str, config: dict) -> None:
+    """Like notify_error, but queued for the background sender (non-blocking, no message_id)."""
+    try:
+        _notify_queue.put_nowait(
+            (send_telegram_plain, (_error_message(error_type, details), config, _async_session))
+        )
+    except queue.Full:
+        logger.warning("Telegram send queue full, dropping error message: %s", error_type)
 
 
-def notify_disk_space(free_gb: float, config: dict) -> int | None:
-    """Notify about low disk space."""
-    return send_telegram(
+def notify_disk_space(free_gb: float, config: dict) -> None:
+    """Notify about low disk space (non-blocking)."""
+    send_telegram_async(
         f"\u26a0\ufe0f Мало места на диске: {free_gb:.1f} ГБ свободно", config
     )
 
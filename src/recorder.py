@@ -9,6 +9,8 @@ to this camera's non-standard RTSP implementation directly.
 import os
 import signal
 import subprocess
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 
@@ -16,14 +18,35 @@ import yaml
 
 from logger_setup import setup_logger
 
+# libyaml-backed loader when PyYAML was built with it, else the pure-Python one
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
 logger = setup_logger(__name__)
 
+# Parsed configs keyed by (resolved path, mtime_ns): re-reads only if the file changed
+_config_cache: dict[tuple[str, int], dict] = {}
+
+# Segment file name (without extension): "15.10.2026 14_00"
+FILENAME_FORMAT = "%d.%m.%Y %H_%M"
+
+# Recording file types managed by cleanup (.ts = raw VLC capture, .mp4 = remuxed)
+MEDIA_SUFFIXES = (".mp4", ".ts")
+
 
 def load_config(config_path: str) -> dict:
-    path = Path(config_path)
+    path = Path(config_path).resolve()
+    cache_key = (str(path), path.stat().st_mtime_ns)
+    if cache_key in _config_cache:
+        return _config_cache[cache_key]
+
     with open(path, "r", encoding="utf-8") as f:
-        config = yaml.safe_load(f)
-    logger.info("Config loaded from %s", path.resolve())
+        config = yaml.load(f, Loader=YamlLoader)
+    _config_cache.clear()
+    _config_cache[cache_key] = config
+    logger.info("Config loaded from %s", path)
     return config
 
 
@@ -41,28 +64,41 @@ def remux_ts_to_mp4(ts_path: str, config: dict) -> str | None:
     mp4_path = ts_file.with_suffix(".mp4")
     ffmpeg_path = config.get("ffmpeg", {}).get("path", "ffmpeg")
 
+    # Quiet FFmpeg: only errors reach stderr, so the captured output stays small
+    # regardless of stream length (no banner, no per-frame stats)
     remux_cmd = [
         ffmpeg_path, "-y",
+        "-hide_banner", "-nostats", "-loglevel", "error",
         "-i", str(ts_file),
         "-c", "copy",
         "-an",
-        "-movflags", "+faststart",
-        str(mp4_path),
     ]
+    # +faststart rewrites the whole file to move the moov atom to the front.
+    # Kinescope re-processes uploads, so it is off unless explicitly enabled.
+    if config.get("recording", {}).get("faststart", False):
+        remux_cmd += ["-movflags", "+faststart"]
+    remux_cmd.append(str(mp4_path))
 
     logger.info("Remuxing to MP4: %s → %s", ts_file.name, mp4_path.name)
 
     remux_timeout = 60  # remux is near-instant
 
     try:
-        result = subprocess.run(remux_cmd, capture_output=True, text=True, timeout=remux_timeout)
+        # stdout unused; stderr kept as raw bytes and decoded only on failure
+        result = subprocess.run(
+            remux_cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            timeout=remux_timeout,
+        )
     except subprocess.TimeoutExpired:
         logger.error("Remux timed out after %ds", remux_timeout)
         return None
 
     if result.returncode != 0:
+        stderr_tail = result.stderr[-4096:].decode("utf-8", errors="replace") if result.stderr else ""
         logger.error("Remux failed (exit code %d): %s", result.returncode,
-                      result.stderr[-500:] if result.stderr else "no stderr")
+                      stderr_tail[-500:] if stderr_tail else "no stderr")
         return None
 
     # Remove .ts after successful remux
@@ -73,11 +109,22 @@ def remux_ts_to_mp4(ts_path: str, config: dict) -> str | None:
     return str(mp4_path)
 
 
-def record_segment(config: dict, duration_override: int = None) -> str:
+def record_segment(
+    config: dict,
+    duration_override: int = None,
+    stop_event: threading.Event = None,
+    started_at: datetime = None,
+) -> str:
     """Record a video segment: VLC captures RTSP to .ts, FFmpeg remuxes to .mp4.
 
+    With recording.skip_remux enabled the .ts is returned as-is.
+    If stop_event fires, VLC is stopped within ~0.5s and the .ts is returned
+    without remuxing (enqueue_pending_files remuxes it on the next start).
+    started_at names the file; pass the same timestamp used for notifications
+    so both show the same name (defaults to now).
+
     Returns:
-        Full path to the created MP4 file on success, or None on failure.
+        Full path to the created MP4 (or .ts) file on success, or None on failure.
     """
     rtsp_url = config["camera"]["rtsp_url"]
     duration = duration_override or config["recording"]["duration_seconds"]
@@ -86,8 +133,7 @@ def record_segment(config: dict, duration_override: int = None) -> str:
 
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    now = datetime.now()
-    base_name = now.strftime("%d.%m.%Y %H_%M")
+    base_name = (started_at or datetime.now()).strftime(FILENAME_FORMAT)
     ts_path = output_dir / (base_name + ".ts")
 
     # Step 1: VLC captures RTSP → .ts
@@ -104,24 +150,38 @@ def record_segment(config: dict, duration_override: int = None) -> str:
         rtsp_url, duration, ts_path,
     )
 
-    try:
-        process = subprocess.Popen(
-            vlc_cmd,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
-        # Wait for the recording duration, then terminate VLC
-        process.wait(timeout=duration)
+    process = subprocess.Popen(
+        vlc_cmd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    # VLC records until we kill it. Wait in 0.5s steps so stop_event (tray Exit)
+    # ends the segment promptly instead of after the full duration.
+    started = time.monotonic()
+    deadline = started + duration
+    stop_requested = False
+    while process.poll() is None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        if stop_event is None:
+            time.sleep(min(0.5, remaining))
+        elif stop_event.wait(min(0.5, remaining)):
+            stop_requested = True
+            break
+
+    if process.poll() is not None:
         logger.warning("VLC exited early (code %d) before duration elapsed", process.returncode)
-    except subprocess.TimeoutExpired:
-        # Expected: VLC records until we kill it
+    else:
         process.terminate()
         try:
             process.wait(timeout=15)
         except subprocess.TimeoutExpired:
             process.kill()
             process.wait(timeout=5)
-        logger.info("VLC recording stopped after %ds", duration)
+        logger.info("VLC recording stopped after %ds%s", time.monotonic() - started,
+                    " (stop requested)" if stop_requested else "")
 
     # Check .ts file was created
     if not ts_path.exists() or ts_path.stat().st_size == 0:
@@ -133,6 +193,11 @@ def record_segment(config: dict, duration_override: int = None) -> str:
     ts_size_mb = ts_path.stat().st_size / (1024 * 1024)
     logger.info("VLC recording saved: %s (%.1f MB)", ts_path, ts_size_mb)
 
+    # Kinescope accepts MPEG-TS directly; skipping the remux saves a full file rewrite.
+    # On shutdown, skip it too: the process may exit before FFmpeg finishes.
+    if config["recording"].get("skip_remux", False) or stop_requested:
+        return str(ts_path)
+
     # Step 2: Remux .ts → .mp4
     mp4_result = remux_ts_to_mp4(str(ts_path), config)
     return mp4_result if mp4_result else str(ts_path)
@@ -149,7 +214,8 @@ def cleanup_old_recordings(config: dict, skip_files: set = None) -> None:
 
     Args:
         config: Application config dict.
-        skip_files: Set of absolute file path strings to skip (e.g. files being uploaded).
+        skip_files: Set of file path strings to skip (e.g. files being uploaded);
+            relative and absolute forms are both matched.
     """
     output_dir = Path(config["recording"]["output_dir"])
     max_files = config["recording"]["max_local_files"]
@@ -157,31 +223,44 @@ def cleanup_old_recordings(config: dict, skip_files: set = None) -> None:
     if not output_dir.exists():
         return
 
-    # Clean both .mp4 and .ts files
-    media_files = sorted(
-        list(output_dir.glob("*.mp4")) + list(output_dir.glob("*.ts")),
-        key=lambda p: p.stat().st_mtime,
-    )
+    # Clean both .mp4 and .ts files in one directory pass, oldest first by integer
+    # st_mtime_ns. DirEntry.stat() is served from the directory listing on
+    # Windows, so each file costs one stat at most. Files can vanish mid-pass
+    # (another cleanup or a finished upload deleted them): those are skipped.
+    media_files = []
+    with os.scandir(output_dir) as it:
+        for entry in it:
+            if not (entry.is_file(follow_symlinks=False) and entry.name.endswith(MEDIA_SUFFIXES)):
+                continue
+            try:
+                media_files.append((entry.stat().st_mtime_ns, output_dir / entry.name))
+            except FileNotFoundError:
+                continue
+    media_files.sort()
 
     files_to_delete = len(media_files) - max_files
     if files_to_delete <= 0:
         return
 
-    skip = skip_files or set()
-    deleted = 0
-    for old_file in media_files[:files_to_delete]:
-        if str(old_file.resolve()) in skip or str(old_file) in skip:
+    # Normalize skip paths once instead of resolving every candidate
+    skip = {os.path.normcase(os.path.abspath(p)) for p in (skip_files or ())}
+    deleted_paths = []
+    for _, old_file in media_files[:files_to_delete]:
+        if os.path.normcase(os.path.abspath(old_file)) in skip:
             logger.info("Skipping file in use: %s", old_file)
             continue
         try:
-            old_file.unlink()
-            deleted += 1
-            logger.info("Deleted old recording: %s", old_file)
+            os.unlink(old_file)
+            deleted_paths.append(str(old_file))
+            logger.debug("Deleted old recording: %s", old_file)
+        except FileNotFoundError:
+            logger.debug("Already deleted: %s", old_file)
         except PermissionError:
             logger.warning("Cannot delete (file in use): %s", old_file)
 
-    if deleted:
-        logger.info("Cleanup complete: removed %d file(s)", deleted)
+    # One summary line instead of a log line per file
+    if deleted_paths:
+        logger.info("Cleanup complete: removed %d file(s): %s", len(deleted_paths), deleted_paths[:5])
 
 
 if __name__ == "__main__":
@@ -9,12 +9,18 @@ from pathlib import Path
 import requests
 import yaml
 
+# Faster libyaml loader if available: the shutdown window is short
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
 
 def main():
     try:
         config_path = Path(__file__).parent.parent / "config.yaml"
         with open(config_path, "r", encoding="utf-8") as f:
-            config = yaml.safe_load(f)
+            config = yaml.load(f, Loader=YamlLoader)
 
         bot_token = config["telegram"]["bot_token"]
         chat_id = config["telegram"]["chat_id"]
@@ -5,7 +5,9 @@ Runs main() in a background daemon thread.
 Context menu: Pause/Resume, Open logs, Exit.
 """
 
+import functools
 import os
+import subprocess
 import sys
 import threading
 from pathlib import Path
@@ -26,9 +28,13 @@ _stop_event = threading.Event()
 _pause_event = threading.Event()
 
 
+@functools.lru_cache(maxsize=4)
 def create_camera_icon(size: int = 64, paused: bool = False) -> Image.Image:
     """Draw a simple camera icon using Pillow.
 
+    Cached per (size, paused): toggling pause reuses the already-drawn image.
+    Callers must not modify the returned image.
+
     Args:
         size: Icon size in pixels.
         paused: If True, draw yellow dot instead of red (pause indicator).
@@ -92,7 +98,6 @@ def open_logs():
     if sys.platform == "win32":
         os.startfile(str(log_dir))
     elif sys.platform == "darwin":
-        import subprocess
         subprocess.Popen(["open", str(log_dir)])
 
 
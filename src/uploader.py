@@ -7,12 +7,19 @@ Auth: Bearer token in header.
 After upload, fetches video details from the main API to get play_link.
 """
 
+import os
+import random
+import socket
 import sys
+import threading
 import time
 from pathlib import Path
 
 import requests
 import yaml
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
 
 from logger_setup import setup_logger
 
@@ -21,9 +28,95 @@ logger = setup_logger(__name__)
 KINESCOPE_UPLOAD_URL = "https://uploader.kinescope.io/v2/video"
 KINESCOPE_API_URL = "https://api.kinescope.io/v1"
 
+# Default socket send buffer for uploads. The OS default (~64 KiB on Windows)
+# caps in-flight data below the bandwidth-delay product of a 4G/ADSL uplink.
+DEFAULT_UPLOAD_SNDBUF = 4 * 1024 * 1024
+
+# Upper bound (seconds) for the backoff between play_link polls
+PLAY_LINK_MAX_DELAY = 8
+
+# Upload body read size: 1 MiB reads instead of requests' default 8 KiB
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Shared keep-alive session, created on first use (needs config for SO_SNDBUF)
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+class SendBufferAdapter(HTTPAdapter):
+    """HTTPAdapter that sets SO_SNDBUF on every connection it opens."""
+
+    def __init__(self, sndbuf: int, **kwargs):
+        # Must be set before super().__init__, which calls init_poolmanager
+        self._sndbuf = sndbuf
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, socket.SO_SNDBUF, self._sndbuf),
+        ]
+        super().init_poolmanager(*args, **kwargs)
+
+
+def _get_session(config: dict) -> requests.Session:
+    """Return the shared Kinescope session, creating it on first call.
+
+    The upload, play_link polling and the next segment's upload reuse TLS
+    connections. Connect errors are retried for any method; read/status retries
+    only for GET, because the streamed upload body cannot be replayed.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            sndbuf = config.get("kinescope", {}).get("upload_sndbuf_bytes", DEFAULT_UPLOAD_SNDBUF)
+            session = requests.Session()
+            session.mount("https://", SendBufferAdapter(
+                sndbuf,
+                pool_connections=4,
+                pool_maxsize=8,
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=1,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=frozenset(["GET"]),
+                    raise_on_status=False,
+                ),
+            ))
+            _session = session
+            logger.info("Kinescope HTTP session created (SO_SNDBUF=%d)", sndbuf)
+        return _session
+
+
+def video_content_type(filepath: str) -> str:
+    """MIME type for an upload: MPEG-TS for .ts segments, MP4 otherwise."""
+    return "video/mp2t" if filepath.lower().endswith(".ts") else "video/mp4"
+
+
+class _ChunkedFileBody:
+    """Upload body that reads the file in large chunks and reports its length.
+
+    requests takes Content-Length from ``__len__``, so the body is sent with a
+    plain length header instead of chunked transfer encoding.
+    """
+
+    def __init__(self, fh, size: int, chunk_size: int = UPLOAD_CHUNK_SIZE):
+        self._fh = fh
+        self._size = size
+        self._chunk_size = chunk_size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self):
+        while True:
+            chunk = self._fh.read(self._chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
 
 def upload_to_kinescope(filepath: str, title: str, config: dict) -> dict:
-    """Upload an MP4 video file to Kinescope.
+    """Upload an MP4 (or MPEG-TS) video file to Kinescope.
 
     Returns:
         Dict with keys: 'video_id', 'play_link', 'title', 'raw_response'.
@@ -34,7 +127,9 @@ def upload_to_kinescope(filepath: str, title: str, config: dict) -> dict:
     parent_id = config["kinescope"]["parent_id"]
 
     path = Path(filepath)
-    file_size_mb = path.stat().st_size / (1024 * 1024)
+    # Single stat: size is reused for the logs and the body length
+    file_size = os.stat(filepath).st_size
+    file_size_mb = file_size / (1024 * 1024)
 
     logger.info(
         "Upload started: file=%s size=%.2f MB title=%s",
@@ -45,14 +140,15 @@ def upload_to_kinescope(filepath: str, title: str, config: dict) -> dict:
         "Authorization": f"Bearer {api_key}",
         "X-Parent-ID": parent_id,
         "X-Video-Title": title,
-        "Content-Type": "video/mp4",
+        "Content-Type": video_content_type(filepath),
     }
 
-    with open(path, "rb") as f:
-        response = requests.post(
+    # Unbuffered file + large reads: one syscall per MiB, no second buffer layer
+    with open(path, "rb", buffering=0) as f:
+        response = _get_session(config).post(
             KINESCOPE_UPLOAD_URL,
             headers=headers,
-            data=f,
+            data=_ChunkedFileBody(f, file_size),
             timeout=7200,
         )
 
@@ -60,8 +156,8 @@ def upload_to_kinescope(filepath: str, title: str, config: dict) -> dict:
 
     upload_result = response.json()
     logger.info(
-        "Upload succeeded: status=%d response=%s",
-        response.status_code, str(upload_result)[:300],
+        "Upload succeeded: status=%d size=%.2f MB response=%s",
+        response.status_code, file_size_mb, str(upload_result)[:300],
     )
 
     # Extract video_id from upload response
@@ -72,7 +168,7 @@ def upload_to_kinescope(filepath: str, title: str, config: dict) -> dict:
     # Try to get play_link via main API
     play_link = None
     if video_id:
-        play_link = get_video_play_link(video_id, api_key)
+        play_link = get_video_play_link(video_id, api_key, _get_session(config))
 
     return {
         "video_id": video_id,
@@ -82,17 +178,19 @@ def upload_to_kinescope(filepath: str, title: str, config: dict) -> dict:
     }
 
 
-def get_video_play_link(video_id: str, api_key: str, retries: int = 3) -> str:
+def get_video_play_link(video_id: str, api_key: str, session: requests.Session = None, retries: int = 4) -> str:
     """Fetch play_link for a video from Kinescope API.
 
-    The video may take a moment to appear after upload, so we retry.
+    The video may take a moment to appear after upload, so we retry with
+    exponential backoff (1s, 2s, 4s, ... capped at PLAY_LINK_MAX_DELAY) plus jitter.
     Returns play_link URL string, or None if not available.
     """
     headers = {"Authorization": f"Bearer {api_key}"}
+    http = session or requests
 
     for attempt in range(retries):
         try:
-            resp = requests.get(
+            resp = http.get(
                 f"{KINESCOPE_API_URL}/videos/{video_id}",
                 headers=headers,
                 timeout=30,
@@ -107,7 +205,8 @@ def get_video_play_link(video_id: str, api_key: str, retries: int = 3) -> str:
             logger.warning("Failed to fetch play_link (attempt %d): %s", attempt + 1, exc)
 
         if attempt < retries - 1:
-            time.sleep(5)
+            delay = min(2 ** attempt, PLAY_LINK_MAX_DELAY)
+            time.sleep(delay + random.uniform(0, 0.5))
 
     logger.warning("Could not get play_link for video %s after %d attempts", video_id, retries)
     return None